@@ -0,0 +1,151 @@
+"""
+Metadata cache shared by every worker process.
+
+Values are already serialized JSON bodies (bytes), so a hit can be sent as is.
+
+Entries are stored in Redis when REDIS_URL is set (e.g. redis://localhost:6379/0),
+so all Gunicorn workers see the same entries and they survive restarts.
+Configure the Redis server with `maxmemory-policy allkeys-lru` to keep it bounded.
+
+Without REDIS_URL (e.g. the development server) entries fall back to
+in-process caches, one per key type, that honour the same per-entry TTLs.
+
+Keys are namespaced by type and carry every lookup argument:
+sp:track:<id>, sp:album:<id>:<limit>:<offset>:<locale> and sp:playlist:<id>:<limit>:<offset>.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from collections.abc import Callable
+
+from cachetools import TLRUCache
+
+__all__ = ["DEFAULT_TTL", "cache_get", "cache_get_many", "cache_set", "cache_get_or_set"]
+
+# One hour
+DEFAULT_TTL = 3600
+
+REDIS_URL = os.environ.get("REDIS_URL")
+
+
+def _expires(_key: str, entry: tuple[int, bytes], now: float) -> float:
+    """When an in-process (ttl, value) entry expires"""
+    return now + entry[0]
+
+
+if REDIS_URL:
+    import redis
+
+    _redis = redis.Redis(
+        connection_pool=redis.ConnectionPool.from_url(REDIS_URL, max_connections=32)
+    )
+else:
+    _redis = None
+    # One cache per type so a burst of one type cannot evict the others.
+    # Entries are stored as (ttl, value) and expire after their own ttl, like in Redis.
+    _local_caches = {
+        "sp:track": TLRUCache(maxsize=500, ttu=_expires),
+        "sp:album": TLRUCache(maxsize=200, ttu=_expires),
+        "sp:playlist": TLRUCache(maxsize=100, ttu=_expires),
+    }
+    _local_lock = threading.Lock()
+
+
+class _Flight:
+    """A value being produced for one key, handed to every caller waiting on it"""
+
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.value: bytes | None = None
+        self.error: BaseException | None = None
+
+
+# Keys currently being produced in this process
+_in_flight: dict[str, _Flight] = {}
+_in_flight_lock = threading.Lock()
+
+
+def _local_cache(key: str) -> TLRUCache:
+    """The in-process cache for the type `key` is namespaced under"""
+    return _local_caches[":".join(key.split(":", 2)[:2])]
+
+
+def cache_get(key: str) -> bytes | None:
+    """Returns the cached value for `key`, or None on a miss"""
+    return cache_get_many([key])[0]
+
+
+def cache_get_many(keys: list[str]) -> list[bytes | None]:
+    """Returns the cached values for `keys` in a single round-trip, None for every miss"""
+    if not keys:
+        return []
+
+    if _redis is None:
+        with _local_lock:
+            entries = [_local_cache(key).get(key) for key in keys]
+        return [None if entry is None else entry[1] for entry in entries]
+
+    try:
+        return _redis.mget(keys)
+    except redis.RedisError:
+        # The cache is best effort, an unreachable Redis is just a miss
+        return [None] * len(keys)
+
+
+def cache_set(key: str, value: bytes, ttl: int = DEFAULT_TTL) -> None:
+    """Stores `value` under `key` for `ttl` seconds"""
+    if _redis is None:
+        with _local_lock:
+            _local_cache(key)[key] = (ttl, value)
+        return
+
+    try:
+        _redis.set(key, value, ex=ttl)
+    except redis.RedisError:
+        pass
+
+
+def cache_get_or_set(
+    key: str, producer: Callable[[], bytes], ttl: int = DEFAULT_TTL
+) -> bytes:
+    """
+    Returns the value cached under `key`, calling `producer` to build and cache it on a miss.
+
+    Concurrent misses for the same key in this process are collapsed: only the
+    first caller runs `producer`, the others wait for it and get its value, or
+    its exception, without touching the cache again.
+    """
+    value = cache_get(key)
+    if value is not None:
+        return value
+
+    with _in_flight_lock:
+        flight = _in_flight.get(key)
+        leader = flight is None
+        if leader:
+            flight = _in_flight[key] = _Flight()
+
+    if not leader:
+        flight.done.wait()
+        if flight.error is not None:
+            raise flight.error
+        return flight.value
+
+    try:
+        # It may have been cached between our miss and taking the lead
+        value = cache_get(key)
+        if value is None:
+            value = producer()
+            cache_set(key, value, ttl)
+        flight.value = value
+        return value
+    except BaseException as error:
+        flight.error = error
+        raise
+    finally:
+        with _in_flight_lock:
+            del _in_flight[key]
+        flight.done.set()
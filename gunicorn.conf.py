@@ -0,0 +1,11 @@
+from multiprocessing import cpu_count
+
+bind = "0.0.0.0:8000"
+
+# tls_client performs requests inside a Go shared library called through ctypes,
+# which gevent cannot monkey-patch, so a greenlet would block its whole worker.
+# Threads do overlap those calls since ctypes releases the GIL while they run.
+worker_class = "gthread"
+workers = cpu_count()
+threads = 32
+keepalive = 30
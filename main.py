@@ -1,12 +1,35 @@
-from flask import Flask, jsonify, make_response
-from spotapi import PublicTrack, PublicAlbum, PublicPlaylist
-from cachetools import cached, TTLCache
+from flask import Flask, Response, make_response, redirect, request, stream_with_context
+from spotapi import PublicTrack, PublicAlbum, PublicPlaylist, TrackError, AlbumError, PlaylistError, RequestError, BaseClientError
+from werkzeug.exceptions import HTTPException
+from cache import cache_get_many, cache_get_or_set, cache_set
+from functools import lru_cache
+import hashlib
+import orjson
 import re
+import string
+import time
 
 app = Flask(__name__)
 
-# Create a cache with a maximum of 100 items and a TTL of 1 hour (3600 seconds)
-metadata_cache = TTLCache(maxsize=100, ttl=3600)
+# Compiled once at import, matches track, album and playlist URLs alike
+_SPOTIFY_ID_RE = re.compile(r'spotify\.com/(?P<kind>track|album|playlist)/(?P<id>[a-zA-Z0-9]{22})')
+
+# Characters a bare Spotify ID is made of
+_B62 = frozenset(string.ascii_letters + string.digits)
+
+# Stands in for a streamed items list while the rest of the document is serialized
+_ITEMS_PLACEHOLDER = '__spotapi_streamed_items__'
+
+# Seconds an in-process memoized body is served before the shared cache is asked again
+MEMO_PERIOD = 300
+
+# Most IDs a single /tracks request may ask for
+MAX_TRACK_IDS = 50
+
+class InvalidInputError(Exception):
+    """
+    The request does not name a valid Spotify ID or URL
+    """
 
 def get_usage_html():
     """
@@ -52,145 +75,328 @@ def get_usage_html():
     <code>/track/{track_id}</code><br><br>
     <code>/https://open.spotify.com/track/{track_id}</code>
 
+    <h2>Get Multiple Tracks Metadata (up to 50)</h2>
+    <code>/tracks?ids={track_id},{track_id},...</code>
+
     <h2>Get Album Metadata</h2>
     <code>/album/{album_id}</code><br><br>
     <code>/album/{album_id}?limit=X&offset=Y</code><br><br>
+    <code>/album/{album_id}?limit=-1</code> streams every track<br><br>
     <code>/https://open.spotify.com/album/{album_id}</code>
 
     <h2>Get Playlist Metadata</h2>
     <code>/playlist/{playlist_id}</code><br><br>
     <code>/playlist/{playlist_id}?limit=X&offset=Y</code><br><br>
+    <code>/playlist/{playlist_id}?limit=-1</code> streams every track<br><br>
     <code>/https://open.spotify.com/playlist/{playlist_id}</code>
+
+    <h2>Resolve a Spotify URL</h2>
+    <code>/resolve?url=https://open.spotify.com/{type}/{id}</code>
 </body>
 </html>
 """
 
+def _is_bare_id(value):
+    """
+    Check whether value is a bare 22 character base62 Spotify ID
+    """
+    return len(value) == 22 and _B62.issuperset(value)
+
 def extract_spotify_id(url):
     """
     Extract Spotify ID from full Spotify URL or just ID
+    Raises InvalidInputError when url holds neither
+    """
+    # Bare IDs are the common case and need no regex at all
+    if _is_bare_id(url):
+        return url
+
+    match = _SPOTIFY_ID_RE.search(url)
+    if not match:
+        raise InvalidInputError(f"Not a Spotify ID or URL: {url!r}")
+
+    return match.group('id')
+
+def usage_response(status):
+    """
+    Returns the API usage documentation as an HTML response
+    """
+    response = make_response(get_usage_html(), status)
+    response.headers['Content-Type'] = 'text/html'
+    return response
+
+def redirect_to_endpoint(url):
+    """
+    Permanently redirect a full Spotify URL to its canonical endpoint
+    The 301 lets browsers and proxies cache the redirect itself
+    """
+    match = _SPOTIFY_ID_RE.search(url)
+    if not match:
+        return usage_response(400)
+
+    return redirect(f"/{match.group('kind')}/{match.group('id')}", code=301)
+
+def json_response(obj, status=200):
+    """
+    Serialize obj into a JSON response using orjson
+    """
+    return Response(orjson.dumps(obj), status=status, mimetype='application/json')
+
+def cacheable_response(body):
+    """
+    Wrap an already serialized JSON body into a response that clients and proxies may cache
+    Answers with an empty 304 when the client already holds the same body
+    """
+    etag = hashlib.blake2b(body, digest_size=16).hexdigest()
+
+    if request.if_none_match.contains_weak(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, max-age=3600, stale-while-revalidate=86400'
+    return response
+
+def cached_body(key, producer):
+    """
+    Serialized result of producer, shared through the metadata cache under key
+    The serialized bytes are cached so hits skip serialization altogether
+    """
+    return cache_get_or_set(key, lambda: orjson.dumps(producer()))
+
+def time_bucket():
+    """
+    Number of the current in-process period, part of every in-process cache key
+    Entries of past periods are never hit again and fall out of the LRU caches
+    A period is much shorter than the shared cache TTL, so served metadata is at most
+    DEFAULT_TTL + MEMO_PERIOD seconds old, and every rollover is absorbed by the shared cache
+    """
+    return int(time.time() // MEMO_PERIOD)
+
+def stream_json(document, container, chunks):
+    """
+    Stream document as JSON, filling container['items'] with the items of each chunk as it arrives
+    Only one chunk is serialized at a time instead of the whole list
+    The status line is sent before the first chunk is fetched, so a chunk that fails midway
+    is logged and aborts the connection, leaving the client with an incomplete body
+    """
+    items = container['items']
+    container['items'] = _ITEMS_PLACEHOLDER
+    head, tail = orjson.dumps(document).split(orjson.dumps(_ITEMS_PLACEHOLDER), 1)
+    # chunks may yield container itself as its first chunk
+    container['items'] = items
+
+    def generate():
+        yield head + b'['
+        separator = b''
+        try:
+            for chunk in chunks:
+                if chunk['items']:
+                    # Drop the brackets so consecutive chunks join into one list
+                    yield separator + orjson.dumps(chunk['items'])[1:-1]
+                    separator = b','
+        except Exception:
+            app.logger.exception("Streaming %s failed, the response is truncated", request.path)
+            raise
+        yield b']' + tail
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
+
+def fetch_track(track_id):
+    """
+    Fetch raw track metadata from Spotify
+    """
+    return PublicTrack(track_id).get_track_info()
+
+def fetch_album(album_id, limit, offset, locale):
+    """
+    Fetch raw album metadata from Spotify
+    """
+    return PublicAlbum(album_id).get_album_info(limit=limit, offset=offset, locale=locale)
+
+def fetch_playlist(playlist_id, limit, offset):
+    """
+    Fetch raw playlist metadata from Spotify
+    """
+    return PublicPlaylist(playlist_id).get_playlist_info(limit=limit, offset=offset)
+
+# In-process, lock-free layer in front of the shared cache, sized per type
+
+@lru_cache(maxsize=500)
+def track_body(track_id, bucket):
+    """
+    Serialized track metadata, memoized in-process for one MEMO_PERIOD
+    """
+    return cached_body(f"sp:track:{track_id}", lambda: fetch_track(track_id))
+
+@lru_cache(maxsize=200)
+def album_body(album_id, limit, offset, locale, bucket):
+    """
+    Serialized album metadata, memoized in-process for one MEMO_PERIOD
     """
-    patterns = [
-        r'spotify\.com/track/([a-zA-Z0-9]{22})',
-        r'spotify\.com/album/([a-zA-Z0-9]{22})',
-        r'spotify\.com/playlist/([a-zA-Z0-9]{22})'
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
-        if match:
-            return match.group(1)
-    
-    return url
+    return cached_body(f"sp:album:{album_id}:{limit}:{offset}:{locale}", lambda: fetch_album(album_id, limit, offset, locale))
+
+@lru_cache(maxsize=100)
+def playlist_body(playlist_id, limit, offset, bucket):
+    """
+    Serialized playlist metadata, memoized in-process for one MEMO_PERIOD
+    """
+    return cached_body(f"sp:playlist:{playlist_id}:{limit}:{offset}", lambda: fetch_playlist(playlist_id, limit, offset))
 
 @app.route('/track/<path:track_input>')
-@cached(metadata_cache)
 def get_track_metadata(track_input):
     """
     Retrieve raw track metadata
     Support both direct ID and full Spotify URL
     """
-    try:
-        track_id = extract_spotify_id(track_input)
-        track = PublicTrack(track_id)
-        return jsonify(track.get_track_info())
-    except Exception as e:
-        return jsonify({'error': str(e)}), 404
+    track_id = extract_spotify_id(track_input)
+    return cacheable_response(track_body(track_id, time_bucket()))
+
+@app.route('/tracks')
+def get_tracks_metadata():
+    """
+    Retrieve raw metadata for several tracks at once
+    Expects a comma separated list of up to MAX_TRACK_IDS IDs or full Spotify URLs in the ids parameter
+    The response lists the tracks in the order they were asked for
+    """
+    track_inputs = request.args['ids'].split(',')
+    if len(track_inputs) > MAX_TRACK_IDS:
+        raise InvalidInputError(f"At most {MAX_TRACK_IDS} IDs may be requested at once")
+
+    if not all(track_inputs):
+        raise InvalidInputError("Empty entry in ids")
+
+    track_ids = [extract_spotify_id(track_input) for track_input in track_inputs]
+
+    # Serve what we already have and only fetch the rest
+    tracks = {}
+    missing = []
+    hits = cache_get_many([f"sp:track:{track_id}" for track_id in track_ids])
+    for track_id, hit in zip(track_ids, hits):
+        if hit is not None:
+            tracks[track_id] = orjson.loads(hit)
+        else:
+            missing.append(track_id)
+
+    if missing:
+        fetched = PublicTrack().get_tracks_info(missing)
+        for track_id, track_info in fetched.items():
+            # Same key as get_track_metadata uses
+            cache_set(f"sp:track:{track_id}", orjson.dumps(track_info))
+        tracks.update(fetched)
+
+    # Hits and fetched tracks were collected apart, restore the requested order
+    return cacheable_response(orjson.dumps({track_id: tracks[track_id] for track_id in dict.fromkeys(track_ids)}))
 
 @app.route('/album/<path:album_input>')
-@cached(metadata_cache)
 def get_album_metadata(album_input):
     """
     Retrieve raw album metadata with pagination support
     Support both direct ID and full Spotify URL
     Supports optional limit and offset parameters
     """
-    try:
-        album_id = extract_spotify_id(album_input)
+    album_id = extract_spotify_id(album_input)
+
+    # Get query parameters with defaults
+    limit = request.args.get('limit', 50, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    locale = request.args.get('locale', 'en')
+
+    # If requesting all tracks, stream them chunk by chunk
+    if limit == -1:
         album = PublicAlbum(album_id)
-        
-        # Get query parameters with defaults
-        limit = int(app.config.get('limit', 50))
-        offset = int(app.config.get('offset', 0))
-        locale = app.config.get('locale', 'en')
-        
-        # If requesting all tracks, use pagination
-        if limit == -1:
-            all_tracks = []
-            for tracks_chunk in album.paginate_album_tracks(locale=locale):
-                all_tracks.extend(tracks_chunk['items'])
-            
-            # Replace tracks with compiled list
-            album_info = album.get_album_info(limit=50, locale=locale)
-            album_info['data']['albumUnion']['tracks']['items'] = all_tracks
-            album_info['data']['albumUnion']['tracks']['totalCount'] = len(all_tracks)
-            
-            return jsonify(album_info)
-        
-        # Standard retrieval with limit and offset
-        return jsonify(album.get_album_info(limit=limit, offset=offset, locale=locale))
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 404
+        album_info = album.get_album_info(limit=50, locale=locale)
+        return stream_json(
+            album_info,
+            album_info['data']['albumUnion']['tracksV2'],
+            album.paginate_album_tracks_parallel(locale=locale, first_page=album_info),
+        )
+
+    # Standard retrieval with limit and offset
+    return cacheable_response(album_body(album_id, limit, offset, locale, time_bucket()))
 
 @app.route('/playlist/<path:playlist_input>')
-@cached(metadata_cache)
 def get_playlist_metadata(playlist_input):
     """
     Retrieve raw playlist metadata with pagination support
     Support both direct ID and full Spotify URL
     Supports optional limit and offset parameters
     """
-    try:
-        playlist_id = extract_spotify_id(playlist_input)
+    playlist_id = extract_spotify_id(playlist_input)
+
+    # Get query parameters with defaults
+    limit = request.args.get('limit', 343, type=int)
+    offset = request.args.get('offset', 0, type=int)
+
+    # If requesting all tracks, stream them chunk by chunk
+    if limit == -1:
         playlist = PublicPlaylist(playlist_id)
-        
-        # Get query parameters with defaults
-        limit = int(app.config.get('limit', 343))
-        offset = int(app.config.get('offset', 0))
-        
-        # If requesting all tracks, use pagination
-        if limit == -1:
-            all_tracks = []
-            for tracks_chunk in playlist.paginate_playlist():
-                all_tracks.extend(tracks_chunk['items'])
-            
-            # Replace tracks with compiled list
-            playlist_info = playlist.get_playlist_info(limit=343)
-            playlist_info['data']['playlistV2']['content']['items'] = all_tracks
-            playlist_info['data']['playlistV2']['content']['totalCount'] = len(all_tracks)
-            
-            return jsonify(playlist_info)
-        
-        # Standard retrieval with limit and offset
-        return jsonify(playlist.get_playlist_info(limit=limit, offset=offset))
-    
-    except Exception as e:
-        return jsonify({'error': str(e)}), 404
+        playlist_info = playlist.get_playlist_info(limit=343)
+        return stream_json(
+            playlist_info,
+            playlist_info['data']['playlistV2']['content'],
+            playlist.paginate_playlist_parallel(first_page=playlist_info),
+        )
+
+    # Standard retrieval with limit and offset
+    return cacheable_response(playlist_body(playlist_id, limit, offset, time_bucket()))
+
+@app.route('/resolve')
+def resolve_url():
+    """
+    Resolve a full Spotify URL passed in the url parameter to its endpoint
+    """
+    return redirect_to_endpoint(request.args.get('url', ''))
 
 @app.route('/<path:url>')
 def handle_full_url(url):
     """
     Handle full Spotify URLs and redirect to appropriate endpoint
     """
-    if 'track' in url:
-        return get_track_metadata(url)
-    elif 'album' in url:
-        return get_album_metadata(url)
-    elif 'playlist' in url:
-        return get_playlist_metadata(url)
-    else:
-        response = make_response(get_usage_html(), 400)
-        response.headers['Content-Type'] = 'text/html'
-        return response
+    return redirect_to_endpoint(url)
+
+@app.errorhandler(InvalidInputError)
+def bad_request(error):
+    """
+    Invalid input, such as a malformed ID
+    """
+    return json_response({'error': 'Bad Request', 'message': str(error)}, 400)
+
+@app.errorhandler(TrackError)
+@app.errorhandler(AlbumError)
+@app.errorhandler(PlaylistError)
+def spotify_error(error):
+    """
+    Spotify could not return the requested metadata
+    """
+    return json_response({'error': 'Not Found', 'message': str(error)}, 404)
+
+@app.errorhandler(RequestError)
+@app.errorhandler(BaseClientError)
+def upstream_error(error):
+    """
+    Spotify could not be reached or the session could not be set up
+    """
+    return json_response({'error': 'Bad Gateway', 'message': str(error)}, 502)
+
+@app.errorhandler(Exception)
+def internal_error(error):
+    """
+    Any other failure while handling a request
+    """
+    # Let HTTP errors such as 405 keep their own status and handlers
+    if isinstance(error, HTTPException):
+        return error
+
+    return json_response({'error': 'Internal Server Error', 'message': str(error)}, 500)
 
 @app.errorhandler(404)
 def not_found(error):
     """
     Custom 404 error handler with API usage information
     """
-    response = make_response(get_usage_html(), 404)
-    response.headers['Content-Type'] = 'text/html'
-    return response
+    return usage_response(404)
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -1,6 +1,7 @@
 import re
-import atexit
-from collections.abc import Mapping
+import json
+import time
+import threading
 from spotapi.types.annotations import enforce
 from spotapi.types.alias import _UStr, _Undefined
 
@@ -10,6 +11,8 @@ from spotapi.utils.strings import parse_json_string
 
 __all__ = ["BaseClient", "BaseClientError"]
 
+_BIND_LOCK = threading.Lock()
+
 
 @enforce
 class BaseClient:
@@ -18,8 +21,27 @@ class BaseClient:
     This base class contains all the common methods used by the Spotify classes.
 
     NOTE: Should not be used directly. Use the Spotify classes instead.
+
+    One BaseClient is bound to each TLSClient (see `BaseClient.of`), so the session,
+    hashes and tokens it bootstraps are shared by every instance using that client.
     """
 
+    # Spotify access tokens last an hour, start over well before that
+    SESSION_LIFETIME: int = 30 * 60
+    # Everything a session bootstrap sets, swapped in together on a refresh
+    _SESSION_FIELDS = (
+        "js_pack",
+        "client_version",
+        "access_token",
+        "client_token",
+        "client_id",
+        "device_id",
+        "raw_hashes",
+        "xpui_route_num",
+        "xpui_route",
+        "session_started",
+    )
+
     js_pack: _UStr = _Undefined
     client_version: _UStr = _Undefined
     access_token: _UStr = _Undefined
@@ -27,10 +49,21 @@ class BaseClient:
     client_id: _UStr = _Undefined
     device_id: _UStr = _Undefined
     raw_hashes: _UStr = _Undefined
+    session_started: float | None = None
+    # Parsed from raw_hashes on the shared client, so it lives as long as the session
+    op_hashes: dict[str, str] | None = None
+
+    _OP_HASH_RE = re.compile(r'"([^"]+)","(query|mutation)","([^"]+)"')
+    # Shared by all instances, keyed by hash so a rotated hash gets a fresh entry
+    _EXTENSIONS_CACHE: dict[str, str] = {}
 
     def __init__(self, client: TLSClient) -> None:
         self.client = client
         self.client.authenticate = lambda kwargs: self._auth_rule(kwargs)
+        # Guards the lazy bootstrap, which concurrent requests would otherwise all run
+        self._lock = threading.RLock()
+        # Held by the one request refreshing an expired session
+        self._refresh_lock = threading.Lock()
 
         self.browser_version = self.client.client_identifier.split("_")[1]
         self.client.headers.update(
@@ -41,29 +74,78 @@ class BaseClient:
             }
         )
 
-        atexit.register(self.client.close)
+    @staticmethod
+    def of(client: TLSClient) -> "BaseClient":
+        """Returns the BaseClient bound to `client`, creating it on first use"""
+        with _BIND_LOCK:
+            base = getattr(client, "_spotapi_base", None)
 
-    def _auth_rule(self, kwargs: dict) -> dict:
-        if self.client_token is _Undefined:
-            self.get_client_token()
+            if base is None:
+                base = client._spotapi_base = BaseClient(client)
 
-        if self.access_token is _Undefined:
-            self.get_session()
+        return base
+
+    def _auth_rule(self, kwargs: dict) -> dict:
+        # Other requests keep using the old session while one of them refreshes it
+        if self._session_expired() and self._refresh_lock.acquire(blocking=False):
+            try:
+                if self._session_expired():
+                    self._refresh_session()
+            finally:
+                self._refresh_lock.release()
+
+        with self._lock:
+            if self.client_token is _Undefined:
+                self.get_client_token()
+
+            if self.access_token is _Undefined:
+                self.get_session()
+
+            # Read together, so a concurrent refresh cannot mix two sessions
+            access_token = self.access_token
+            client_token = self.client_token
+            client_version = self.client_version
 
         if "headers" not in kwargs:
             kwargs["headers"] = {}
 
-        assert self.access_token is not _Undefined, "Access token is _Undefined"
+        if access_token is _Undefined:
+            raise BaseClientError("Access token is _Undefined")
+
         kwargs["headers"].update(
             {
-                "Authorization": "Bearer " + str(self.access_token),
-                "Client-Token": self.client_token,
-                "Spotify-App-Version": self.client_version,
+                "Authorization": "Bearer " + str(access_token),
+                "Client-Token": client_token,
+                "Spotify-App-Version": client_version,
             }.items()
         )
 
         return kwargs
 
+    def _session_expired(self) -> bool:
+        started = self.session_started
+        return started is not None and time.monotonic() - started > self.SESSION_LIFETIME
+
+    def _refresh_session(self) -> None:
+        """
+        Bootstraps a new session on a scratch BaseClient and swaps it in once complete,
+        the live fields are never left half updated
+        """
+        fresh = object.__new__(BaseClient)
+        fresh.client = self.client
+        fresh.browser_version = self.browser_version
+        fresh._lock = threading.RLock()
+        fresh.get_client_token()
+
+        if fresh.access_token is _Undefined:
+            fresh.get_session()
+
+        with self._lock:
+            for field in self._SESSION_FIELDS:
+                setattr(self, field, getattr(fresh, field, _Undefined))
+            # Parsed again from the new raw_hashes on next use
+            self.op_hashes = None
+
     def get_session(self) -> None:
         resp = self.client.get(
             "https://open.spotify.com",
@@ -80,6 +162,7 @@ class BaseClient:
         self.access_token = parse_json_string(resp.response, "accessToken")
         self.client_id = parse_json_string(resp.response, "clientId")
         self.device_id = parse_json_string(resp.response, "correlationId")
+        self.session_started = time.monotonic()
 
     def get_client_token(self) -> None:
         if not (self.client_id and self.device_id):
@@ -119,29 +202,61 @@ class BaseClient:
                 "Could not get client token", error=resp.response.get("response_type")
             )
 
-        if not isinstance(resp.response, Mapping):
-            raise BaseClientError("Invalid JSON")
-
         self.client_token = resp.response["granted_token"]["token"]
 
+    def _parse_op_hashes(self) -> dict[str, str]:
+        """Maps every persisted operation name to its sha256 hash, parsed once per session"""
+        with self._lock:
+            if self.op_hashes is not None:
+                return self.op_hashes
+
+            if self.raw_hashes is _Undefined:
+                self.get_sha256_hash()
+
+            if self.raw_hashes is _Undefined:
+                raise BaseClientError("Could not get playlist hashes")
+
+            queries: dict[str, str] = {}
+            mutations: dict[str, str] = {}
+            for name, kind, sha256 in self._OP_HASH_RE.findall(str(self.raw_hashes)):
+                # Like the first match of a split, the first occurrence wins
+                (queries if kind == "query" else mutations).setdefault(name, sha256)
+
+            # Queries take precedence over mutations of the same name
+            self.op_hashes = mutations | queries
+            return self.op_hashes
+
     def part_hash(self, name: str) -> str:
-        if self.raw_hashes is _Undefined:
-            self.get_sha256_hash()
+        op_hashes = self.op_hashes
 
-        if self.raw_hashes is _Undefined:
-            raise ValueError("Could not get playlist hashes")
+        if op_hashes is None:
+            op_hashes = self._parse_op_hashes()
 
         try:
-            return str(self.raw_hashes).split(f'"{name}","query","')[1].split('"')[0]
-        except IndexError:
-            return str(self.raw_hashes).split(f'"{name}","mutation","')[1].split('"')[0]
+            return op_hashes[name]
+        except KeyError:
+            raise BaseClientError(f"Could not find the hash of {name}")
+
+    def extensions(self, name: str) -> str:
+        """The `extensions` query parameter of a persisted operation, serialized once per hash"""
+        sha256 = self.part_hash(name)
+        extensions = self._EXTENSIONS_CACHE.get(sha256)
+
+        if extensions is None:
+            extensions = json.dumps(
+                {"persistedQuery": {"version": 1, "sha256Hash": sha256}},
+                separators=(",", ":"),
+            )
+            self._EXTENSIONS_CACHE[sha256] = extensions
+
+        return extensions
 
     def get_sha256_hash(self) -> None:
         if self.js_pack is _Undefined:
             self.get_session()
 
         if self.js_pack is _Undefined:
-            raise ValueError("Could not get playlist hashes")
+            raise BaseClientError("Could not get playlist hashes")
 
         resp = self.client.get(str(self.js_pack))
 
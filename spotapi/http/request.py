@@ -108,6 +108,10 @@ class TLSClient(Session):
     TLS-HTTP Client implementation wrapped around the tls_client library.
 
     This is fully undetected by Spotify.com.
+
+    Browser profiles negotiate HTTP/2, so concurrent requests from threads sharing
+    one client are multiplexed as streams over a single connection per host.
+    Pass `force_http1=True` only for proxies that cannot speak HTTP/2.
     """
 
     def __init__(
@@ -117,8 +121,13 @@ class TLSClient(Session):
         *,
         auto_retries: int = 0,
         auth_rule: Callable[[dict[Any, Any]], dict] | None = None,
+        force_http1: bool = False,
     ) -> None:
-        super().__init__(client_identifier=profile, random_tls_extension_order=True)
+        super().__init__(
+            client_identifier=profile,
+            random_tls_extension_order=True,
+            force_http1=force_http1,
+        )
 
         if proxy:
             self.proxies = {"http": f"http://{proxy}", "https": f"http://{proxy}"}
@@ -150,20 +159,16 @@ class TLSClient(Session):
         self, response: TLSResponse, method: str, danger: bool
     ) -> Response:
         body: Union[str, dict, None] = response.text
-        headers = {key.lower(): value for key, value in response.headers.items()}
-
-        # Spotify doesn't set content-type for some reason?
-        json_encoded = "application/json" in headers.get("content-type", "")
-        is_dict = True
 
+        # Spotify doesn't set content-type for some reason, so always try to decode.
+        # The body is decoded once and reused instead of parsing it again with response.json()
         try:
-            json.loads(body)  # type: ignore
-        except json.JSONDecodeError:
-            is_dict = False
+            json_formatted = json.loads(body)  # type: ignore
+        except (json.JSONDecodeError, TypeError):
+            json_formatted = None
 
-        if json_encoded or is_dict:
-            json_formatted = response.json()
-            body = json_formatted if isinstance(json_formatted, dict) else body
+        if isinstance(json_formatted, dict):
+            body = json_formatted
 
         if not body:
             body = None
@@ -198,7 +203,11 @@ class TLSClient(Session):
     def post(
         self, url: str, *, authenticate: bool = False, danger: bool = False, **kwargs
     ) -> Response:
-        """Routes a POST Request"""
+        """
+        Routes a POST Request
+
+        The body of a successful response is always a JSON object (dict).
+        """
         if authenticate and self.authenticate is not None:
             kwargs = self.authenticate(kwargs)
 
@@ -207,7 +216,12 @@ class TLSClient(Session):
         if response is None:
             raise TLSClientExeption("Request kept failing after retries.")
 
-        return self.parse_response(response, "POST", danger)
+        resp = self.parse_response(response, "POST", danger)
+
+        if resp.success and not isinstance(resp.response, dict):
+            raise RequestError("Invalid JSON", error=resp.error.string)
+
+        return resp
 
     def put(
         self, url: str, *, authenticate: bool = False, danger: bool = False, **kwargs
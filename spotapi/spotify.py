@@ -1,8 +1,10 @@
 from __future__ import annotations
 
 import json
-from typing import Any
-from collections.abc import Mapping, Generator
+from collections import deque
+from concurrent.futures import Executor, Future, ThreadPoolExecutor
+from typing import Any, TypeVar
+from collections.abc import Mapping, Generator, Callable, Iterable
 from spotapi.types.annotations import enforce
 
 from spotapi.exceptions import TrackError, AlbumError, PlaylistError
@@ -11,6 +13,37 @@ from spotapi.client import BaseClient
 
 __all__ = ["PublicTrack", "PublicAlbum", "PublicPlaylist", "TrackError", "AlbumError", "PlaylistError"]
 
+PATHFINDER_URL = "https://api-partner.spotify.com/pathfinder/v1/query"
+
+# Upper bound on in-flight Spotify requests when fetching pages concurrently
+MAX_CONCURRENT_REQUESTS: int = 8
+
+# Every Public* instance shares this client (and its connection pool) unless given its own
+_SHARED_CLIENT = TLSClient("chrome_120", "", auto_retries=3)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _map_window(
+    executor: Executor, func: Callable[[T], R], args: Iterable[T], window: int
+) -> Generator[R, None, None]:
+    """
+    Like `executor.map`, but only submits up to `window` calls ahead of the result being yielded
+
+    Results are yielded in order, so at most `window` of them are held at once.
+    """
+    pending: deque[Future[R]] = deque()
+
+    for arg in args:
+        if len(pending) >= window:
+            yield pending.popleft().result()
+        pending.append(executor.submit(func, arg))
+
+    while pending:
+        yield pending.popleft().result()
+
+
 @enforce
 class PublicTrack:
     """
@@ -20,7 +53,9 @@ class PublicTrack:
     Parameters
     ----------
     track (Optional[str]): The Spotify URI of the track.
-    client (TLSClient): An instance of TLSClient to use for requests.
+    client (Optional[TLSClient]): An instance of TLSClient to use for requests.
+        Defaults to a client shared by all instances.
+        Instances using the same client share its session and tokens.
     """
 
     __slots__ = (
@@ -29,14 +64,18 @@ class PublicTrack:
         "track_link",
     )
 
+    base: BaseClient
+    track_id: str
+    track_link: str
+
     def __init__(
         self,
         track: str | None = None,
         /,
         *,
-        client: TLSClient = TLSClient("chrome_120", "", auto_retries=3),
+        client: TLSClient | None = None,
     ) -> None:
-        self.base = BaseClient(client=client)
+        self.base = BaseClient.of(_SHARED_CLIENT if client is None else client)
 
         if track:
             self.track_id = track.split("track/")[-1] if "track" in track else track
@@ -47,32 +86,44 @@ class PublicTrack:
         if not self.track_id:
             raise ValueError("Track ID not set")
 
-        url = "https://api-partner.spotify.com/pathfinder/v1/query"
+        return self._query_track(self.track_id)
+
+    def get_tracks_info(
+        self, ids: list[str], max_workers: int = MAX_CONCURRENT_REQUESTS
+    ) -> dict[str, Mapping[str, Any]]:
+        """
+        Gets the public track information for several tracks at once, keyed by track ID
+
+        Duplicate IDs are only requested once, the others are requested
+        concurrently through a thread pool of `max_workers` threads.
+        """
+        track_ids = list(dict.fromkeys(ids))
+
+        if not track_ids:
+            return {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            tracks = list(_map_window(executor, self._query_track, track_ids, max_workers))
+
+        return dict(zip(track_ids, tracks))
+
+    def _query_track(self, track_id: str) -> Mapping[str, Any]:
         params = {
             "operationName": "getTrack",
             "variables": json.dumps(
                 {
-                    "uri": f"spotify:track:{self.track_id}",
-                }
-            ),
-            "extensions": json.dumps(
-                {
-                    "persistedQuery": {
-                        "version": 1,
-                        "sha256Hash": self.base.part_hash("getTrack"),
-                    }
-                }
+                    "uri": f"spotify:track:{track_id}",
+                },
+                separators=(",", ":"),
             ),
+            "extensions": self.base.extensions("getTrack"),
         }
 
-        resp = self.base.client.post(url, params=params, authenticate=True)
+        resp = self.base.client.post(PATHFINDER_URL, params=params, authenticate=True)
 
         if resp.fail:
             raise TrackError("Could not get track info", error=resp.error.string)
 
-        if not isinstance(resp.response, Mapping):
-            raise TrackError("Invalid JSON")
-
         return resp.response
 
 @enforce
@@ -84,7 +135,9 @@ class PublicAlbum:
     Parameters
     ----------
     album (Optional[str]): The Spotify URI of the album.
-    client (TLSClient): An instance of TLSClient to use for requests.
+    client (Optional[TLSClient]): An instance of TLSClient to use for requests.
+        Defaults to a client shared by all instances.
+        Instances using the same client share its session and tokens.
     """
 
     __slots__ = (
@@ -93,14 +146,18 @@ class PublicAlbum:
         "album_link",
     )
 
+    base: BaseClient
+    album_id: str
+    album_link: str
+
     def __init__(
         self,
         album: str | None = None,
         /,
         *,
-        client: TLSClient = TLSClient("chrome_120", "", auto_retries=3),
+        client: TLSClient | None = None,
     ) -> None:
-        self.base = BaseClient(client=client)
+        self.base = BaseClient.of(_SHARED_CLIENT if client is None else client)
 
         if album:
             self.album_id = album.split("album/")[-1] if "album" in album else album
@@ -113,7 +170,6 @@ class PublicAlbum:
         if not self.album_id:
             raise ValueError("Album ID not set")
 
-        url = "https://api-partner.spotify.com/pathfinder/v1/query"
         params = {
             "operationName": "getAlbum",
             "variables": json.dumps(
@@ -122,37 +178,36 @@ class PublicAlbum:
                     "offset": offset,
                     "limit": limit,
                     "locale": locale  # Add locale parameter
-                }
-            ),
-            "extensions": json.dumps(
-                {
-                    "persistedQuery": {
-                        "version": 1,
-                        "sha256Hash": self.base.part_hash("getAlbum"),
-                    }
-                }
+                },
+                separators=(",", ":"),
             ),
+            "extensions": self.base.extensions("getAlbum"),
         }
 
-        resp = self.base.client.post(url, params=params, authenticate=True)
+        resp = self.base.client.post(PATHFINDER_URL, params=params, authenticate=True)
 
         if resp.fail:
             raise AlbumError("Could not get album info", error=resp.error.string)
 
-        if not isinstance(resp.response, Mapping):
-            raise AlbumError("Invalid JSON")
-
         return resp.response
 
-    def paginate_album_tracks(self, locale: str = 'en') -> Generator[Mapping[str, Any], None, None]:
+    def paginate_album_tracks_parallel(
+        self,
+        locale: str = 'en',
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        *,
+        first_page: Mapping[str, Any] | None = None,
+    ) -> Generator[Mapping[str, Any], None, None]:
         """
-        Generator that fetches album tracks information in chunks
-        
-        Note: If total_tracks <= 50, then there is no need to paginate
+        Generator that fetches album tracks information in chunks, using a thread pool
+
+        Once the first chunk gives the total count, the remaining chunks are
+        requested at most `max_workers` ahead of the one being yielded, in order.
+        Pass the result of `get_album_info(limit=50)` as `first_page` if you already have it.
         """
         UPPER_LIMIT: int = 50
         # We need to get the total tracks first
-        album = self.get_album_info(limit=UPPER_LIMIT, locale=locale)
+        album = first_page or self.get_album_info(limit=UPPER_LIMIT, locale=locale)
         total_count: int = album["data"]["albumUnion"]["tracksV2"]["totalCount"]
 
         yield album["data"]["albumUnion"]["tracksV2"]
@@ -160,13 +215,25 @@ class PublicAlbum:
         if total_count <= UPPER_LIMIT:
             return
 
-        offset = UPPER_LIMIT
-        while offset < total_count:
-            yield self.get_album_info(limit=UPPER_LIMIT, offset=offset, locale=locale)["data"][
-                "albumUnion"
-            ]["tracksV2"]
-            offset += UPPER_LIMIT
-            
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in _map_window(
+                executor,
+                lambda offset: self.get_album_info(
+                    limit=UPPER_LIMIT, offset=offset, locale=locale
+                ),
+                range(UPPER_LIMIT, total_count, UPPER_LIMIT),
+                max_workers,
+            ):
+                yield page["data"]["albumUnion"]["tracksV2"]
+
+    def paginate_album_tracks(self, locale: str = 'en') -> Generator[Mapping[str, Any], None, None]:
+        """
+        Generator that fetches album tracks information in chunks
+        
+        Note: If total_tracks <= 50, then there is no need to paginate
+        """
+        yield from self.paginate_album_tracks_parallel(locale=locale)
+
 @enforce
 class PublicPlaylist:
     """
@@ -176,7 +243,9 @@ class PublicPlaylist:
     Parameters
     ----------
     playlist (Optional[str]): The Spotify URI of the playlist.
-    client (TLSClient): An instance of TLSClient to use for requests.
+    client (Optional[TLSClient]): An instance of TLSClient to use for requests.
+        Defaults to a client shared by all instances.
+        Instances using the same client share its session and tokens.
     """
 
     __slots__ = (
@@ -185,14 +254,18 @@ class PublicPlaylist:
         "playlist_link",
     )
 
+    base: BaseClient
+    playlist_id: str
+    playlist_link: str
+
     def __init__(
         self,
         playlist: str | None = None,
         /,
         *,
-        client: TLSClient = TLSClient("chrome_120", "", auto_retries=3),
+        client: TLSClient | None = None,
     ) -> None:
-        self.base = BaseClient(client=client)
+        self.base = BaseClient.of(_SHARED_CLIENT if client is None else client)
 
         if playlist:
             self.playlist_id = (
@@ -207,7 +280,6 @@ class PublicPlaylist:
         if not self.playlist_id:
             raise ValueError("Playlist ID not set")
 
-        url = "https://api-partner.spotify.com/pathfinder/v1/query"
         params = {
             "operationName": "fetchPlaylist",
             "variables": json.dumps(
@@ -215,37 +287,35 @@ class PublicPlaylist:
                     "uri": f"spotify:playlist:{self.playlist_id}",
                     "offset": offset,
                     "limit": limit,
-                }
-            ),
-            "extensions": json.dumps(
-                {
-                    "persistedQuery": {
-                        "version": 1,
-                        "sha256Hash": self.base.part_hash("fetchPlaylist"),
-                    }
-                }
+                },
+                separators=(",", ":"),
             ),
+            "extensions": self.base.extensions("fetchPlaylist"),
         }
 
-        resp = self.base.client.post(url, params=params, authenticate=True)
+        resp = self.base.client.post(PATHFINDER_URL, params=params, authenticate=True)
 
         if resp.fail:
             raise PlaylistError("Could not get playlist info", error=resp.error.string)
 
-        if not isinstance(resp.response, Mapping):
-            raise PlaylistError("Invalid JSON")
-
         return resp.response
 
-    def paginate_playlist(self) -> Generator[Mapping[str, Any], None, None]:
+    def paginate_playlist_parallel(
+        self,
+        max_workers: int = MAX_CONCURRENT_REQUESTS,
+        *,
+        first_page: Mapping[str, Any] | None = None,
+    ) -> Generator[Mapping[str, Any], None, None]:
         """
-        Generator that fetches playlist information in chunks
+        Generator that fetches playlist information in chunks, using a thread pool
 
-        Note: If total_tracks <= 343, then there is no need to paginate
+        Once the first chunk gives the total count, the remaining chunks are
+        requested at most `max_workers` ahead of the one being yielded, in order.
+        Pass the result of `get_playlist_info(limit=343)` as `first_page` if you already have it.
         """
         UPPER_LIMIT: int = 343
         # We need to get the total playlists first
-        playlist = self.get_playlist_info(limit=UPPER_LIMIT)
+        playlist = first_page or self.get_playlist_info(limit=UPPER_LIMIT)
         total_count: int = playlist["data"]["playlistV2"]["content"]["totalCount"]
 
         yield playlist["data"]["playlistV2"]["content"]
@@ -253,9 +323,19 @@ class PublicPlaylist:
         if total_count <= UPPER_LIMIT:
             return
 
-        offset = UPPER_LIMIT
-        while offset < total_count:
-            yield self.get_playlist_info(limit=UPPER_LIMIT, offset=offset)["data"][
-                "playlistV2"
-            ]["content"]
-            offset += UPPER_LIMIT
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for page in _map_window(
+                executor,
+                lambda offset: self.get_playlist_info(limit=UPPER_LIMIT, offset=offset),
+                range(UPPER_LIMIT, total_count, UPPER_LIMIT),
+                max_workers,
+            ):
+                yield page["data"]["playlistV2"]["content"]
+
+    def paginate_playlist(self) -> Generator[Mapping[str, Any], None, None]:
+        """
+        Generator that fetches playlist information in chunks
+
+        Note: If total_tracks <= 343, then there is no need to paginate
+        """
+        yield from self.paginate_playlist_parallel()
@@ -27,11 +27,11 @@ def enforce_types(func: Callable[P, R]) -> Callable[P, R]:
     """
     type_hints: Dict[str, Any] = func.__annotations__
     return_type: Optional[Any] = type_hints.get("return")
+    # Get the function's signature once, not on every call
+    sig = inspect.signature(func)
 
     @functools.wraps(func)
     def wrapper(*args: P.args, **kwargs: P.kwargs) -> R:
-        # Get the function's signature
-        sig = inspect.signature(func)
         bound_args = sig.bind(*args, **kwargs)
         bound_args.apply_defaults()
 
@@ -164,12 +164,17 @@ def enforce(cls: _EnforceType) -> _EnforceType:
     over properties and any attributes that are not callable or are special methods
     (e.g., those starting with '__').
 
+    Enforcement is skipped entirely when Python runs optimized (`python -O` or
+    PYTHONOPTIMIZE set), so production callers do not pay for the checks on every call.
+
     Args:
         cls (_EnforceType): The class whose methods will be wrapped with type enforcement.
 
     Returns:
         _EnforceType: The same class with type enforcement applied to its methods.
     """
+    if not __debug__:
+        return cls
 
     for attr_name in dir(cls):
         attr_value = getattr(cls, attr_name)
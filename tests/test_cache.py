@@ -0,0 +1,77 @@
+import threading
+import time
+
+import pytest
+
+import cache
+
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    """Every lookup misses and nothing is kept, so waiters can only get the leader's result"""
+    monkeypatch.setattr(cache, "cache_get", lambda key: None)
+    monkeypatch.setattr(cache, "cache_set", lambda key, value, ttl=cache.DEFAULT_TTL: None)
+
+
+def run_concurrently(func, n=8):
+    results, errors = [], []
+    start = threading.Barrier(n)
+
+    def run():
+        start.wait()
+        try:
+            results.append(func())
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return results, errors
+
+
+def test_concurrent_misses_call_producer_once(no_cache):
+    calls = []
+
+    def producer():
+        calls.append(1)
+        time.sleep(0.1)
+        return b"value"
+
+    results, errors = run_concurrently(
+        lambda: cache.cache_get_or_set("sp:track:single", producer)
+    )
+
+    assert len(calls) == 1
+    assert results == [b"value"] * 8
+    assert not errors
+    assert not cache._in_flight
+
+
+def test_concurrent_misses_share_producer_error(no_cache):
+    calls = []
+
+    def producer():
+        calls.append(1)
+        time.sleep(0.1)
+        raise RuntimeError("upstream failed")
+
+    results, errors = run_concurrently(
+        lambda: cache.cache_get_or_set("sp:track:failing", producer)
+    )
+
+    assert len(calls) == 1
+    assert not results
+    assert len(errors) == 8
+    assert all(isinstance(error, RuntimeError) for error in errors)
+    assert not cache._in_flight
+
+
+def test_get_or_set_caches_value():
+    key = "sp:album:cached:50:0:en"
+    assert cache.cache_get_or_set(key, lambda: b"first") == b"first"
+    assert cache.cache_get_or_set(key, lambda: b"second") == b"first"
+    assert cache.cache_get_many([key, "sp:playlist:missing:343:0"]) == [b"first", None]
@@ -0,0 +1,49 @@
+import orjson
+import pytest
+
+import main
+
+
+def stream(document, container, chunks):
+    with main.app.test_request_context("/album/x?limit=-1"):
+        response = main.stream_json(document, container, chunks)
+        return b"".join(response.response)
+
+
+def test_stream_json_round_trips():
+    first = {"totalCount": 5, "items": [{"n": 0}, {"n": 1}]}
+    document = {"data": {"albumUnion": {"name": "a\"b", "tracksV2": first}}}
+    # The first chunk is the container itself, like a paginator given first_page
+    chunks = [first, {"items": []}, {"items": [{"n": 2}, {"n": 3}]}, {"items": [{"n": 4}]}]
+
+    body = stream(document, first, iter(chunks))
+
+    expected = {
+        "data": {
+            "albumUnion": {
+                "name": "a\"b",
+                "tracksV2": {"totalCount": 5, "items": [{"n": n} for n in range(5)]},
+            }
+        }
+    }
+    assert orjson.loads(body) == expected
+
+
+def test_stream_json_without_items():
+    container = {"totalCount": 0, "items": []}
+    document = {"content": container}
+
+    body = stream(document, container, iter([container]))
+
+    assert orjson.loads(body) == {"content": {"totalCount": 0, "items": []}}
+
+
+def test_stream_json_failure_truncates_body():
+    container = {"items": [1]}
+
+    def chunks():
+        yield container
+        raise RuntimeError("page failed")
+
+    with pytest.raises(RuntimeError):
+        stream({"content": container}, container, chunks())
@@ -0,0 +1,73 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from spotapi import BaseClientError
+from spotapi.client import BaseClient
+from spotapi.http.request import TLSClient
+from spotapi.spotify import _map_window
+
+
+class CountingExecutor(ThreadPoolExecutor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.submitted = 0
+        self.lock = threading.Lock()
+
+    def submit(self, *args, **kwargs):
+        with self.lock:
+            self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+
+def slow_identity(value):
+    # Later arguments finish first, so order has to be restored
+    time.sleep(0.001 * (10 - value % 10))
+    return value
+
+
+@pytest.mark.parametrize("window", [1, 3, 8])
+def test_map_window_keeps_order_and_bounds_in_flight(window):
+    with CountingExecutor(max_workers=window) as executor:
+        results = []
+        for result in _map_window(executor, slow_identity, range(40), window):
+            # Results submitted but not yet handed out, this one included
+            assert executor.submitted - len(results) <= window
+            results.append(result)
+
+    assert results == list(range(40))
+
+
+def test_map_window_raises_failure_in_order():
+    def fail_on_five(value):
+        if value == 5:
+            raise ValueError(value)
+        return value
+
+    results = []
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        with pytest.raises(ValueError):
+            for result in _map_window(executor, fail_on_five, range(10), 4):
+                results.append(result)
+
+    assert results == [0, 1, 2, 3, 4]
+
+
+def test_part_hash_parses_bundle():
+    base = BaseClient(TLSClient("chrome_120", ""))
+    base.raw_hashes = (
+        '"getTrack","mutation","m1",'
+        '"getTrack","query","q1",'
+        '"getTrack","query","q2",'
+        '"addToLibrary","mutation","m2"'
+    )
+
+    # Queries win over mutations, the first occurrence wins
+    assert base.part_hash("getTrack") == "q1"
+    assert base.part_hash("addToLibrary") == "m2"
+    assert '"sha256Hash":"q1"' in base.extensions("getTrack")
+
+    with pytest.raises(BaseClientError):
+        base.part_hash("missing")
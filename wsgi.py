@@ -0,0 +1,8 @@
+"""
+WSGI entry point for production servers.
+
+    PYTHONOPTIMIZE=1 gunicorn -c gunicorn.conf.py wsgi:app
+"""
+from main import app
+
+__all__ = ["app"]